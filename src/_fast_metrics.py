@@ -0,0 +1,148 @@
+"""
+_fast_metrics.py
+
+Kernels compilados com Numba para o cálculo das métricas de holdout.
+
+Uso interno de src/metrics.py. Os kernels recebem a permutação que ordena as
+probabilidades de forma decrescente (a ordenação é feita em NumPy, fora do
+njit) e percorrem os dados uma única vez.
+
+As assinaturas são declaradas explicitamente: a compilação ocorre no import
+e fica em cache em disco, de modo que folds de validação cruzada não pagam o
+custo de compilação na primeira chamada de cada processo. Cada kernel tem
+também uma sobrecarga para arrays somente leitura (Series do pandas com
+copy-on-write, memmaps, ``setflags(write=False)``): os kernels nunca escrevem
+nas entradas.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+from numba import njit, prange, types
+
+
+def _readonly(dtype):
+    """Tipo Numba de um array 1-D somente leitura, de layout qualquer."""
+    return types.Array(dtype, 1, "A", readonly=True)
+
+
+@njit(
+    [
+        "Tuple((f8, f8, f8, f8, f8))(int8[::1], float32[::1], int64[::1], float32, float64)",
+        types.UniTuple(types.float64, 5)(
+            _readonly(types.int8),
+            _readonly(types.float32),
+            _readonly(types.int64),
+            types.float32,
+            types.float64,
+        ),
+    ],
+    cache=True,
+)
+def _all_metrics(y_true, y_proba, order, threshold, zero_division):
+    """
+    Calcula (pr_auc, roc_auc, precision, recall, f1) em uma única varredura.
+
+    - PR-AUC segue a mesma definição do sklearn (average precision): soma de
+      (R_k - R_{k-1}) * P_k sobre os thresholds distintos.
+    - ROC-AUC segue a formulação de Mann-Whitney, com empates contando 0.5.
+    - precision/recall/f1 usam as contagens acumuladas até o threshold.
+
+    Probabilidades empatadas formam um único threshold, como no sklearn.
+    y_proba não pode conter NaN (validado por quem chama).
+    Quando alguma das classes está ausente, ROC-AUC é retornado como 0.0;
+    o tratamento do valor indefinido fica a cargo de quem chama.
+    """
+    n = order.shape[0]
+    n_pos = 0.0
+    for k in range(n):
+        if y_true[k] != 0:
+            n_pos += 1.0
+    n_neg = n - n_pos
+
+    tp = 0.0
+    fp = 0.0
+    tp_thr = 0.0
+    fp_thr = 0.0
+    ap = 0.0
+    auc = 0.0
+
+    i = 0
+    while i < n:
+        score = y_proba[order[i]]
+        d_tp = 0.0
+        d_fp = 0.0
+        while i < n and y_proba[order[i]] == score:
+            if y_true[order[i]] != 0:
+                d_tp += 1.0
+            else:
+                d_fp += 1.0
+            i += 1
+
+        # positivos do grupo superam os negativos abaixo e empatam com os do grupo
+        auc += d_tp * (n_neg - fp - 0.5 * d_fp)
+        tp += d_tp
+        fp += d_fp
+        if d_tp > 0.0:
+            ap += d_tp * (tp / (tp + fp))
+        if score >= threshold:
+            tp_thr = tp
+            fp_thr = fp
+
+    pr_auc = ap / n_pos if n_pos > 0.0 else 0.0
+    roc_auc = auc / (n_pos * n_neg) if n_pos > 0.0 and n_neg > 0.0 else 0.0
+
+    fn_thr = n_pos - tp_thr
+    precision = tp_thr / (tp_thr + fp_thr) if tp_thr + fp_thr > 0.0 else zero_division
+    recall = tp_thr / n_pos if n_pos > 0.0 else zero_division
+    denom = 2.0 * tp_thr + fp_thr + fn_thr
+    f1 = 2.0 * tp_thr / denom if denom > 0.0 else zero_division
+
+    return pr_auc, roc_auc, precision, recall, f1
+
+
+@njit(
+    [
+        "Tuple((i8[:], i8[:], i8[:]))(int8[::1], float32[::1], float32[::1])",
+        types.UniTuple(types.int64[:], 3)(
+            _readonly(types.int8),
+            _readonly(types.float32),
+            _readonly(types.float32),
+        ),
+    ],
+    cache=True,
+    parallel=True,
+)
+def _sweep_counts(y_true, y_proba, thresholds):
+    """
+    Calcula (tp, fp, fn) para cada threshold de uma varredura.
+
+    Os thresholds são distribuídos entre threads (prange); cada um acumula
+    suas contagens em uma única passagem, sem desvios, pelos N elementos.
+    """
+    n = y_true.shape[0]
+    k = thresholds.shape[0]
+
+    n_pos = 0
+    for i in range(n):
+        if y_true[i] != 0:
+            n_pos += 1
+
+    tp = np.zeros(k, dtype=np.int64)
+    fp = np.zeros(k, dtype=np.int64)
+    fn = np.zeros(k, dtype=np.int64)
+    for j in prange(k):
+        thr = thresholds[j]
+        tp_j = 0
+        alertas_j = 0
+        for i in range(n):
+            # acumulação sem desvios condicionais: o resultado da comparação
+            # entra como 0/1, evitando erros de previsão de branch
+            hit = np.int64(y_proba[i] >= thr)
+            alertas_j += hit
+            tp_j += hit & np.int64(y_true[i] != 0)
+        tp[j] = tp_j
+        fp[j] = alertas_j - tp_j
+        fn[j] = n_pos - tp_j
+
+    return tp, fp, fn
@@ -11,19 +11,19 @@ mas centraliza:
 - utilitários para seleção consistente de variáveis
 """
 
-from typing import List, Dict
+from typing import Dict, FrozenSet, List, Tuple
 
 
 # =========================
 # Papéis das colunas
 # =========================
 
-COLUNAS_RASTREIO: List[str] = [
+COLUNAS_RASTREIO: Tuple[str, ...] = (
     "id_transacao",
     "id_cartao",
     "ts_transacao",
     "data_transacao",
-]
+)
 
 COLUNA_ALVO: str = "target_fraude"
 
@@ -32,18 +32,18 @@ COLUNA_ALVO: str = "target_fraude"
 # Features categóricas
 # =========================
 
-FEATURES_CATEGORICAS: List[str] = [
+FEATURES_CATEGORICAS: Tuple[str, ...] = (
     "temp_faixa",
     "valor_transacao_faixa",
     "periodo_dia",
-]
+)
 
 
 # =========================
 # Features numéricas
 # =========================
 
-FEATURES_NUMERICAS: List[str] = [
+FEATURES_NUMERICAS: Tuple[str, ...] = (
     "hora_transacao",
     "dia_semana",
     "fim_de_semana",
@@ -78,7 +78,15 @@ FEATURES_NUMERICAS: List[str] = [
     "valor_zscore_cartao",
     "valor_outlier_cartao",
     "uso_acima_media_dia_cartao",
-]
+)
+
+
+# =========================
+# Conjuntos pré-computados
+# =========================
+
+_ALL_FEATURES: Tuple[str, ...] = FEATURES_CATEGORICAS + FEATURES_NUMERICAS
+_ALL_FEATURES_SET: FrozenSet[str] = frozenset(_ALL_FEATURES)
 
 
 # =========================
@@ -91,10 +99,10 @@ def get_features() -> Dict[str, List[str]]:
     Útil para construção de pipelines e validações.
     """
     return {
-        "rastreio": COLUNAS_RASTREIO,
+        "rastreio": list(COLUNAS_RASTREIO),
         "alvo": [COLUNA_ALVO],
-        "categoricas": FEATURES_CATEGORICAS,
-        "numericas": FEATURES_NUMERICAS,
+        "categoricas": list(FEATURES_CATEGORICAS),
+        "numericas": list(FEATURES_NUMERICAS),
     }
 
 
@@ -103,7 +111,7 @@ def get_feature_names() -> List[str]:
     Retorna a lista completa de features utilizadas na modelagem,
     excluindo colunas de rastreio e a variável alvo.
     """
-    return FEATURES_CATEGORICAS + FEATURES_NUMERICAS
+    return list(_ALL_FEATURES)
 
 
 def validate_feature_set(columns: List[str]) -> None:
@@ -111,10 +119,7 @@ def validate_feature_set(columns: List[str]) -> None:
     Valida se o conjunto de colunas fornecido contém todas as features esperadas.
     Levanta erro caso alguma esteja ausente.
     """
-    expected = set(get_feature_names())
-    received = set(columns)
-
-    missing = expected - received
+    missing = _ALL_FEATURES_SET.difference(columns)
     if missing:
         raise ValueError(
             f"Conjunto de features inconsistente. Features ausentes: {sorted(missing)}"
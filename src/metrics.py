@@ -7,9 +7,13 @@ em bilhetagem eletrônica.
 Objetivos:
 - Padronizar o cálculo de métricas no holdout
 - Consolidar resultados de validação cruzada
-- Apoiar análise de trade-off operacional (alertas vs fraudes capturadas)
+- Apoiar análise de trade-off operacional (alertas vs fraudes capturadas),
+  inclusive em varreduras de threshold
 
 Observação:
+Os cálculos usam kernels compilados com Numba (src/_fast_metrics.py) quando
+disponível; sem numba, são usados caminhos equivalentes em NumPy/sklearn.
+
 Este projeto prioriza PR-AUC (Average Precision) como métrica principal,
 por ser mais informativa em cenários desbalanceados e alinhada ao objetivo de
 priorização de risco.
@@ -18,18 +22,17 @@ priorização de risco.
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Dict, Tuple, Optional
+from functools import cached_property
+from typing import Dict, Tuple, Optional, Union
 
 import numpy as np
 import pandas as pd
-from sklearn.metrics import (
-    average_precision_score,
-    roc_auc_score,
-    precision_score,
-    recall_score,
-    f1_score,
-    confusion_matrix,
-)
+
+try:
+    from src._fast_metrics import _all_metrics, _sweep_counts
+except ImportError:  # numba ausente: caminhos equivalentes em NumPy/sklearn
+    _all_metrics = None
+    _sweep_counts = None
 
 
 # =========================
@@ -48,46 +51,221 @@ class HoldoutResults:
     f1: float
 
 
+@dataclass(frozen=True, eq=False)
+class HoldoutContext:
+    """
+    Arrays canônicos de um holdout (rótulos int8, probabilidades float32).
+
+    Construído uma única vez por holdout/modelo com from_arrays e repassado às
+    funções de métricas no lugar de (y_true, y_proba), evitando repetir as
+    conversões a cada chamada. A ordenação decrescente das probabilidades e
+    o buffer de predições binárias são criados sob demanda e reaproveitados.
+    Por compartilhar esse buffer, um mesmo contexto não deve ser usado em
+    paralelo por várias threads.
+    """
+
+    y_true: np.ndarray
+    y_proba: np.ndarray
+
+    @classmethod
+    def from_arrays(cls, y_true, y_proba) -> "HoldoutContext":
+        y_true = np.asarray(y_true, dtype=np.int8)
+        y_proba = np.asarray(y_proba, dtype=np.float32)
+        if len(y_true) != len(y_proba):
+            raise ValueError("y_true e y_proba devem ter o mesmo tamanho.")
+        return cls(y_true=y_true, y_proba=y_proba)
+
+    @cached_property
+    def order(self) -> np.ndarray:
+        return _descending_order(self.y_proba)
+
+    @cached_property
+    def pred_buf(self) -> np.ndarray:
+        # buffer uint8 visto como bool: recebe a binarização de cada threshold
+        return np.empty(len(self.y_proba), dtype=np.uint8).view(bool)
+
+
+HoldoutInput = Union[np.ndarray, HoldoutContext]
+
+
+def _as_context(
+    y_true: HoldoutInput,
+    y_proba: Optional[np.ndarray],
+) -> HoldoutContext:
+    """
+    Normaliza a entrada das funções de métricas para um HoldoutContext.
+    """
+    if isinstance(y_true, HoldoutContext):
+        if y_proba is not None:
+            raise ValueError("Com HoldoutContext, y_proba não deve ser informado.")
+        return y_true
+    if y_proba is None:
+        raise ValueError("y_proba é obrigatório quando y_true não é um HoldoutContext.")
+    return HoldoutContext.from_arrays(y_true, y_proba)
+
+
 # =========================
-# Métricas principais
+# Contagens binárias
 # =========================
 
-def compute_classification_metrics(
+def _compute_confusion_counts(
     y_true: np.ndarray,
     y_proba: np.ndarray,
+    threshold: float,
+    out: Optional[np.ndarray] = None,
+) -> Tuple[int, int, int, int]:
+    """
+    Calcula (tp, fp, fn, tn) binarizando as probabilidades uma única vez.
+
+    Base de todas as métricas por threshold do módulo, no lugar das chamadas
+    separadas a precision/recall/f1/confusion_matrix do sklearn, que revalidam
+    e percorrem os arrays a cada chamada. Aceita arrays crus ou já convertidos
+    para int8/float32 (sem cópia nesse caso).
+
+    out, se informado, é um buffer bool de tamanho N reaproveitado para a
+    binarização (ex.: HoldoutContext.pred_buf), evitando alocações em
+    chamadas repetidas.
+
+    O threshold é convertido para float32, a mesma precisão das
+    probabilidades: um np.float64 manteria a comparação em float64 e poderia
+    divergir dos demais caminhos (ex.: float32(0.7) < float64(0.7)).
+    """
+    y_true_b = np.asarray(y_true, dtype=np.int8) != 0
+    pred = np.greater_equal(
+        np.asarray(y_proba, dtype=np.float32), np.float32(threshold), out=out
+    )
+
+    n_pred = int(np.count_nonzero(pred))
+    tp = int(np.count_nonzero(np.logical_and(pred, y_true_b, out=pred)))
+    fp = n_pred - tp
+    fn = int(np.count_nonzero(y_true_b)) - tp
+    tn = int(len(y_true_b)) - tp - fp - fn
+    return tp, fp, fn, tn
+
+
+def _rates_from_counts(
+    tp: int,
+    fp: int,
+    fn: int,
+    zero_division: float = 0,
+) -> Tuple[float, float, float]:
+    """
+    Deriva (precision, recall, f1) a partir das contagens, com o mesmo
+    tratamento de divisão por zero do sklearn.
+    """
+    precision = tp / (tp + fp) if (tp + fp) else float(zero_division)
+    recall = tp / (tp + fn) if (tp + fn) else float(zero_division)
+    f1 = 2 * tp / (2 * tp + fp + fn) if (2 * tp + fp + fn) else float(zero_division)
+    return float(precision), float(recall), float(f1)
+
+
+def _descending_order(y_proba: np.ndarray) -> np.ndarray:
+    """
+    Permutação que ordena as probabilidades de forma decrescente.
+
+    Calculada uma única vez por holdout e reaproveitada por PR-AUC, ROC-AUC e
+    varreduras de threshold, evitando repetir a ordenação O(N log N).
+    """
+    return np.argsort(-np.asarray(y_proba, dtype=np.float32), kind="stable")
+
+
+def _check_order(order, y_proba: np.ndarray) -> np.ndarray:
+    """
+    Valida uma permutação informada por quem chama e a converte para int64.
+
+    Os kernels indexam os arrays sem checagem de limites, então a permutação
+    precisa ser completa, dentro de [0, N) e ordenar y_proba de forma
+    decrescente. Todas as verificações são O(N).
+    """
+    order = np.asarray(order)
+    n = len(y_proba)
+    if order.ndim != 1 or len(order) != n:
+        raise ValueError("order deve ser um array 1D com o mesmo tamanho de y_proba.")
+    if n == 0:
+        return order.astype(np.int64)
+    if not np.issubdtype(order.dtype, np.integer):
+        raise ValueError("order deve conter índices inteiros.")
+    if order.min() < 0 or order.max() >= n:
+        raise ValueError("order contém índices fora do intervalo [0, N).")
+    order = order.astype(np.int64, copy=False)
+    if np.bincount(order, minlength=n).max() > 1:
+        raise ValueError("order deve ser uma permutação (sem índices repetidos).")
+    sorted_proba = y_proba[order]
+    if not (sorted_proba[:-1] >= sorted_proba[1:]).all():
+        raise ValueError("order deve ordenar y_proba de forma decrescente.")
+    return order
+
+
+# =========================
+# Métricas principais
+# =========================
+
+def compute_classification_metrics(
+    y_true: HoldoutInput,
+    y_proba: Optional[np.ndarray] = None,
     threshold: float = 0.5,
     zero_division: int = 0,
+    *,
+    order: Optional[np.ndarray] = None,
 ) -> HoldoutResults:
     """
     Calcula o conjunto padrão de métricas do projeto a partir de probabilidades.
 
     Parâmetros
     ----------
-    y_true : array
-        Rótulos verdadeiros (0/1).
-    y_proba : array
+    y_true : array | HoldoutContext
+        Rótulos verdadeiros (0/1), ou um HoldoutContext com rótulos e
+        probabilidades já convertidos (nesse caso y_proba não é informado).
+    y_proba : array | None
         Probabilidades estimadas para classe positiva (fraude = 1).
     threshold : float
         Limiar para converter probabilidade em classe.
     zero_division : int
         Comportamento do precision/recall quando não há positivos previstos.
+    order : array | None
+        Permutação opcional que ordena y_proba de forma decrescente, como a
+        retornada por _descending_order. Permite reaproveitar a mesma
+        ordenação em várias chamadas sobre o mesmo holdout. É validada em
+        O(N) (permutação de [0, N) que ordena y_proba de forma decrescente);
+        caso contrário, levanta ValueError. Se None, é calculada (ou
+        reaproveitada do HoldoutContext). Ignorada sem numba, já que o
+        caminho do sklearn ordena internamente.
 
     Retorno
     -------
     HoldoutResults
         Conjunto padronizado de métricas.
     """
-    y_true = np.asarray(y_true).astype(int)
-    y_proba = np.asarray(y_proba).astype(float)
-
-    y_pred = (y_proba >= threshold).astype(int)
-
-    pr_auc = float(average_precision_score(y_true, y_proba))
-    # ROC-AUC exige ambas as classes presentes
-    roc_auc = float(roc_auc_score(y_true, y_proba)) if len(np.unique(y_true)) > 1 else float("nan")
-    precision = float(precision_score(y_true, y_pred, zero_division=zero_division))
-    recall = float(recall_score(y_true, y_pred, zero_division=zero_division))
-    f1 = float(f1_score(y_true, y_pred, zero_division=zero_division))
+    # int8/float32 bastam para rótulos binários e probabilidades e reduzem
+    # o volume de memória percorrido nas passagens seguintes
+    ctx = _as_context(y_true, y_proba)
+    y_true, y_proba = ctx.y_true, ctx.y_proba
+    if not np.isfinite(y_proba).all():
+        raise ValueError("y_proba contém valores não finitos (NaN ou infinito).")
+
+    # ROC-AUC exige ambas as classes presentes (verificação em O(N), sem ordenar)
+    both_classes = bool(y_true.any() and not y_true.all())
+
+    if _all_metrics is not None:
+        # ordenação feita uma única vez em NumPy; todas as métricas saem da
+        # mesma varredura compilada
+        order = ctx.order if order is None else _check_order(order, y_proba)
+        pr_auc, roc_auc, precision, recall, f1 = _all_metrics(
+            y_true, y_proba, order, np.float32(threshold), float(zero_division)
+        )
+    else:
+        # sklearn só é carregado quando o kernel compilado não está disponível
+        from sklearn.metrics import average_precision_score, roc_auc_score
+
+        pr_auc = float(average_precision_score(y_true, y_proba))
+        roc_auc = float(roc_auc_score(y_true, y_proba)) if both_classes else float("nan")
+        tp, fp, fn, _ = _compute_confusion_counts(
+            y_true, y_proba, threshold, out=ctx.pred_buf
+        )
+        precision, recall, f1 = _rates_from_counts(tp, fp, fn, zero_division=zero_division)
+
+    if not both_classes:
+        roc_auc = float("nan")
 
     return HoldoutResults(
         pr_auc=pr_auc,
@@ -99,20 +277,21 @@ def compute_classification_metrics(
 
 
 def compute_confusion_matrix(
-    y_true: np.ndarray,
-    y_proba: np.ndarray,
+    y_true: HoldoutInput,
+    y_proba: Optional[np.ndarray] = None,
     threshold: float = 0.5,
 ) -> pd.DataFrame:
     """
     Retorna a matriz de confusão em formato DataFrame com rótulos legíveis.
-    """
-    y_true = np.asarray(y_true).astype(int)
-    y_proba = np.asarray(y_proba).astype(float)
-    y_pred = (y_proba >= threshold).astype(int)
 
-    cm = confusion_matrix(y_true, y_pred, labels=[0, 1])
+    Aceita (y_true, y_proba) ou um HoldoutContext no lugar de y_true.
+    """
+    ctx = _as_context(y_true, y_proba)
+    tp, fp, fn, tn = _compute_confusion_counts(
+        ctx.y_true, ctx.y_proba, threshold, out=ctx.pred_buf
+    )
     return pd.DataFrame(
-        cm,
+        [[tn, fp], [fn, tp]],
         index=["Real: Não Fraude", "Real: Fraude"],
         columns=["Predito: Não Fraude", "Predito: Fraude"],
     )
@@ -154,17 +333,17 @@ def consolidate_cv_results(
     Retorna DataFrame com colunas: ['modelo','metrica','mean','std'].
     """
     if isinstance(cv_summary, dict):
-        rows = []
-        for metric, stats in cv_summary.items():
-            rows.append(
-                {
-                    "modelo": model_name,
-                    "metrica": metric,
-                    "mean": float(stats.get("mean", np.nan)),
-                    "std": float(stats.get("std", np.nan)),
-                }
-            )
-        return pd.DataFrame(rows)
+        n = len(cv_summary)
+        metrics = np.empty(n, dtype=object)
+        means = np.empty(n, dtype=np.float64)
+        stds = np.empty(n, dtype=np.float64)
+        for i, (metric, stats) in enumerate(cv_summary.items()):
+            metrics[i] = metric
+            means[i] = stats.get("mean", np.nan)
+            stds[i] = stats.get("std", np.nan)
+        return pd.DataFrame(
+            {"modelo": model_name, "metrica": metrics, "mean": means, "std": stds}
+        )
 
     if isinstance(cv_summary, pd.DataFrame):
         df = cv_summary.copy()
@@ -186,8 +365,8 @@ def consolidate_cv_results(
 # =========================
 
 def operational_tradeoff(
-    y_true: np.ndarray,
-    y_proba: np.ndarray,
+    y_true: HoldoutInput,
+    y_proba: Optional[np.ndarray] = None,
     threshold: float = 0.5,
 ) -> Dict[str, float]:
     """
@@ -197,19 +376,19 @@ def operational_tradeoff(
     - fraudes_capturadas: verdadeiros positivos
     - fraudes_perdidas: falsos negativos
     - precision, recall no threshold adotado
-    """
-    y_true = np.asarray(y_true).astype(int)
-    y_proba = np.asarray(y_proba).astype(float)
-    y_pred = (y_proba >= threshold).astype(int)
 
-    tn, fp, fn, tp = confusion_matrix(y_true, y_pred, labels=[0, 1]).ravel()
+    Aceita (y_true, y_proba) ou um HoldoutContext no lugar de y_true.
+    """
+    ctx = _as_context(y_true, y_proba)
+    tp, fp, fn, tn = _compute_confusion_counts(
+        ctx.y_true, ctx.y_proba, threshold, out=ctx.pred_buf
+    )
 
     alertas_totais = int(tp + fp)
-    total = int(len(y_true))
+    total = tp + fp + fn + tn
     pct_alertas = float(alertas_totais / total) if total else float("nan")
 
-    precision = float(precision_score(y_true, y_pred, zero_division=0))
-    recall = float(recall_score(y_true, y_pred, zero_division=0))
+    precision, recall, _ = _rates_from_counts(tp, fp, fn, zero_division=0)
 
     return {
         "alertas_totais": alertas_totais,
@@ -221,6 +400,55 @@ def operational_tradeoff(
     }
 
 
+def _sorted_sweep_counts(
+    y_true: np.ndarray,
+    y_proba: np.ndarray,
+    order: np.ndarray,
+    thresholds: np.ndarray,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Calcula (tp, fp, fn) por threshold a partir da ordenação decrescente.
+
+    O número de alertas em cada threshold é a posição de corte nas
+    probabilidades ordenadas (np.searchsorted) e os verdadeiros positivos
+    saem da soma acumulada dos rótulos na mesma ordem.
+    """
+    # probabilidades negadas ficam em ordem crescente, como exige o searchsorted
+    neg_sorted = -y_proba[order]
+    cum_pos = np.zeros(len(order) + 1, dtype=np.int64)
+    np.cumsum(y_true[order] != 0, out=cum_pos[1:])
+
+    alertas = np.searchsorted(neg_sorted, -thresholds, side="right")
+    tp = cum_pos[alertas]
+    fp = alertas - tp
+    fn = cum_pos[-1] - tp
+    return tp, fp, fn
+
+
+def _tradeoff_columns(
+    tp: np.ndarray,
+    fp: np.ndarray,
+    fn: np.ndarray,
+    total: int,
+) -> Dict[str, np.ndarray]:
+    """
+    Monta as colunas de trade-off operacional a partir de vetores de contagens.
+    """
+    alertas = tp + fp
+    pct_alertas = alertas / total if total else np.full(len(alertas), np.nan)
+    precision = np.where(alertas > 0, tp / np.maximum(alertas, 1), 0.0)
+    recall = np.where(tp + fn > 0, tp / np.maximum(tp + fn, 1), 0.0)
+
+    return {
+        "alertas_totais": alertas.astype(int),
+        "pct_alertas": pct_alertas.astype(float),
+        "fraudes_capturadas": tp.astype(int),
+        "fraudes_perdidas": fn.astype(int),
+        "precision": precision.astype(float),
+        "recall": recall.astype(float),
+    }
+
+
 def tradeoff_table(
     y_true: np.ndarray,
     proba_by_model: Dict[str, np.ndarray],
@@ -244,11 +472,81 @@ def tradeoff_table(
     DataFrame com colunas:
     ['modelo','alertas_totais','pct_alertas','fraudes_capturadas','fraudes_perdidas','precision','recall']
     """
-    rows = []
-    for model_name, y_proba in proba_by_model.items():
-        stats = operational_tradeoff(y_true=y_true, y_proba=y_proba, threshold=threshold)
-        rows.append({"modelo": model_name, **stats})
+    y_true_b = np.asarray(y_true, dtype=np.int8) != 0
+
+    # matriz (K, N) com as probabilidades de todos os modelos: a binarização e
+    # as contagens saem de uma única operação vetorizada
+    P = np.stack([np.asarray(p, dtype=np.float32) for p in proba_by_model.values()])
+    pred = P >= np.float32(threshold)
 
-    df = pd.DataFrame(rows)
+    tp = np.count_nonzero(pred & y_true_b[None, :], axis=1)
+    fp = np.count_nonzero(pred, axis=1) - tp
+    fn = int(np.count_nonzero(y_true_b)) - tp
+
+    df = pd.DataFrame(
+        {
+            "modelo": list(proba_by_model.keys()),
+            **_tradeoff_columns(tp, fp, fn, total=int(len(y_true_b))),
+        }
+    )
     return df.sort_values(by="pct_alertas", ascending=False).reset_index(drop=True)
 
+
+def operational_tradeoff_sweep(
+    y_true: HoldoutInput,
+    y_proba: Optional[np.ndarray] = None,
+    thresholds: Optional[np.ndarray] = None,
+    *,
+    order: Optional[np.ndarray] = None,
+) -> pd.DataFrame:
+    """
+    Calcula os indicadores de operational_tradeoff para vários thresholds.
+
+    Equivale a chamar operational_tradeoff para cada threshold, útil para
+    curvas de precision/recall e escolha de threshold:
+    - se a ordenação decrescente estiver disponível (order informado ou
+      HoldoutContext), os cortes são localizados com np.searchsorted sobre as
+      probabilidades ordenadas, em O(K log N) após uma soma acumulada O(N);
+    - caso contrário, as contagens saem de um único kernel compilado,
+      paralelo entre thresholds, sem ordenar os dados (sem numba, a
+      ordenação é calculada e o primeiro caminho é usado).
+
+    Parâmetros
+    ----------
+    y_true : array | HoldoutContext
+        Target do holdout, ou um HoldoutContext (nesse caso y_proba não é
+        informado).
+    y_proba : array | None
+        Probabilidades estimadas para classe positiva (fraude = 1).
+    thresholds : array
+        Thresholds avaliados.
+    order : array | None
+        Permutação que ordena y_proba de forma decrescente (mesmo contrato de
+        compute_classification_metrics).
+
+    Retorno
+    -------
+    DataFrame com colunas:
+    ['threshold','alertas_totais','pct_alertas','fraudes_capturadas','fraudes_perdidas','precision','recall']
+    """
+    if thresholds is None:
+        raise ValueError("thresholds é obrigatório.")
+    ctx = _as_context(y_true, y_proba)
+    thresholds = np.asarray(thresholds, dtype=np.float32).ravel()
+
+    if order is not None:
+        order = _check_order(order, ctx.y_proba)
+    elif isinstance(y_true, HoldoutContext) or _sweep_counts is None:
+        order = ctx.order
+
+    if order is not None:
+        tp, fp, fn = _sorted_sweep_counts(ctx.y_true, ctx.y_proba, order, thresholds)
+    else:
+        tp, fp, fn = _sweep_counts(ctx.y_true, ctx.y_proba, thresholds)
+
+    return pd.DataFrame(
+        {
+            "threshold": thresholds.astype(float),
+            **_tradeoff_columns(tp, fp, fn, total=int(len(ctx.y_true))),
+        }
+    )
@@ -7,6 +7,7 @@ Este arquivo fornece componentes reutilizáveis e consistentes com o que foi
 implementado no notebook de modelagem:
 - definição do ColumnTransformer padrão (numérico + categórico)
 - suporte a padronização numérica quando necessário (modelos lineares)
+- FastPreprocessor: alternativa vetorizada ao ColumnTransformer padrão
 - utilitários para inspeção de nomes pós-encoding (interpretabilidade)
 
 Observação:
@@ -19,14 +20,85 @@ from __future__ import annotations
 from typing import List, Tuple
 
 import numpy as np
+import pandas as pd
+from sklearn.base import BaseEstimator, TransformerMixin
 from sklearn.pipeline import Pipeline
 from sklearn.compose import ColumnTransformer
-from sklearn.preprocessing import OneHotEncoder, StandardScaler
+from sklearn.preprocessing import FunctionTransformer, OneHotEncoder, StandardScaler
 from sklearn.impute import SimpleImputer
 
 from src.features import FEATURES_NUMERICAS, FEATURES_CATEGORICAS
 
 
+# =========================
+# Conversão de tipos
+# =========================
+
+def to_float32(X):
+    """
+    Converte a matriz (densa ou esparsa) para float32, sem cópia quando possível.
+
+    Usada como último passo do bloco numérico: float32 reduz pela metade a
+    memória e a banda percorrida no treino (em especial no Random Forest, que
+    já opera internamente em float32).
+    """
+    return X.astype(np.float32, copy=False)
+
+
+def _as_float32(X) -> np.ndarray:
+    """
+    Converte DataFrame ou array em ndarray float32, com nulos como NaN.
+    """
+    if hasattr(X, "to_numpy"):
+        return X.to_numpy(dtype=np.float32, na_value=np.nan)
+    return np.asarray(X, dtype=np.float32)
+
+
+# =========================
+# Imputação vetorizada
+# =========================
+
+class FastMedianImputer(BaseEstimator, TransformerMixin):
+    """
+    Imputação pela mediana em float32, equivalente a SimpleImputer(strategy="median").
+
+    O fit calcula todas as medianas com uma única chamada a np.nanmedian e o
+    transform preenche os nulos com um único np.where, sem iterações por
+    coluna. Colunas inteiramente nulas são imputadas com 0 e mantidas na
+    saída (o SimpleImputer as descartaria).
+    """
+
+    def fit(self, X, y=None):
+        if hasattr(X, "columns"):
+            self.feature_names_in_ = np.asarray(X.columns, dtype=object)
+        X = _as_float32(X)
+        self.n_features_in_ = X.shape[1]
+
+        medians = np.nanmedian(X, axis=0) if len(X) else np.zeros(X.shape[1])
+        self.medians_ = np.nan_to_num(medians, nan=0.0).astype(np.float32)
+        return self
+
+    def transform(self, X) -> np.ndarray:
+        if not hasattr(self, "medians_"):
+            raise AttributeError("FastMedianImputer precisa ser ajustado (fit) antes.")
+        X = _as_float32(X)
+        if X.ndim != 2:
+            raise ValueError("X precisa ser uma matriz 2D.")
+        if X.shape[1] != self.n_features_in_:
+            raise ValueError(
+                f"X possui {X.shape[1]} features, mas o FastMedianImputer "
+                f"foi ajustado com {self.n_features_in_}."
+            )
+        return np.where(np.isnan(X), self.medians_, X)
+
+    def get_feature_names_out(self, input_features=None) -> np.ndarray:
+        if input_features is None:
+            input_features = getattr(
+                self, "feature_names_in_", [f"x{i}" for i in range(self.n_features_in_)]
+            )
+        return np.asarray(input_features, dtype=object)
+
+
 # =========================
 # Construção do preprocessador
 # =========================
@@ -50,22 +122,27 @@ def build_preprocessor(
         Se True, aplica StandardScaler nas variáveis numéricas.
         Recomendado para modelos lineares.
     ohe_sparse : bool
-        Se True, produz matriz esparsa no OneHotEncoder.
+        Se True, permite saída esparsa (sparse_threshold padrão de 0.3).
         Por padrão (False), retorna denso para facilitar interpretabilidade
-        e extração de coeficientes.
+        e extração de coeficientes. O OneHotEncoder trabalha sempre em
+        formato esparso (float32), evitando materializar o bloco denso
+        intermediário.
 
     Retorno
     -------
     ColumnTransformer
     """
-    numeric_features = numeric_features or FEATURES_NUMERICAS
-    categorical_features = categorical_features or FEATURES_CATEGORICAS
+    numeric_features = numeric_features or list(FEATURES_NUMERICAS)
+    categorical_features = categorical_features or list(FEATURES_CATEGORICAS)
 
     numeric_steps = [
-        ("imputer", SimpleImputer(strategy="median")),
+        ("imputer", FastMedianImputer()),
     ]
     if scale_numeric:
         numeric_steps.append(("scaler", StandardScaler()))
+    numeric_steps.append(
+        ("to_float32", FunctionTransformer(to_float32, feature_names_out="one-to-one"))
+    )
     numeric_transformer = Pipeline(steps=numeric_steps)
 
     categorical_transformer = Pipeline(
@@ -75,7 +152,8 @@ def build_preprocessor(
                 "encoder",
                 OneHotEncoder(
                     handle_unknown="ignore",
-                    sparse_output=ohe_sparse,
+                    sparse_output=True,
+                    dtype=np.float32,
                 ),
             ),
         ]
@@ -87,10 +165,162 @@ def build_preprocessor(
             ("cat", categorical_transformer, categorical_features),
         ],
         remainder="drop",
+        sparse_threshold=0.3 if ohe_sparse else 0.0,
         verbose_feature_names_out=False,
     )
 
 
+# =========================
+# Preprocessador vetorizado
+# =========================
+
+class FastPreprocessor(BaseEstimator, TransformerMixin):
+    """
+    Alternativa ao ColumnTransformer padrão para o conjunto fixo de features.
+
+    Produz a mesma matriz de build_preprocessor (numéricas imputadas pela
+    mediana e opcionalmente padronizadas, seguidas do one-hot das categóricas,
+    com categorias desconhecidas ignoradas), mas trabalha diretamente sobre
+    blocos NumPy float32:
+    - as posições das colunas são resolvidas uma única vez no fit
+    - medianas, médias, desvios e categorias ficam pré-computados
+    - o transform monta a matriz de saída em uma única alocação
+
+    Evita a reindexação do DataFrame por nome a cada transform, o que pesa
+    em chamadas repetidas de predict_proba (ex.: validação cruzada).
+    A saída é sempre densa.
+
+    Parâmetros
+    ----------
+    numeric_features : list[str] | None
+        Lista de features numéricas. Se None, usa a lista oficial do projeto.
+    categorical_features : list[str] | None
+        Lista de features categóricas. Se None, usa a lista oficial do projeto.
+    scale_numeric : bool
+        Se True, padroniza as variáveis numéricas (média 0, desvio 1).
+    """
+
+    def __init__(
+        self,
+        numeric_features: List[str] | None = None,
+        categorical_features: List[str] | None = None,
+        scale_numeric: bool = False,
+    ):
+        self.numeric_features = numeric_features
+        self.categorical_features = categorical_features
+        self.scale_numeric = scale_numeric
+
+    def _positions(self, X) -> Tuple[np.ndarray, List[int]]:
+        num_idx = np.array(
+            [X.columns.get_loc(c) for c in self.numeric_features_], dtype=np.intp
+        )
+        cat_idx = [X.columns.get_loc(c) for c in self.categorical_features_]
+        return num_idx, cat_idx
+
+    def fit(self, X, y=None):
+        if not hasattr(X, "columns"):
+            raise TypeError("X precisa ser um pandas DataFrame.")
+
+        self.numeric_features_ = list(self.numeric_features or FEATURES_NUMERICAS)
+        self.categorical_features_ = list(self.categorical_features or FEATURES_CATEGORICAS)
+        self.columns_ = tuple(X.columns)
+        self.num_idx_, self.cat_idx_ = self._positions(X)
+
+        num = _as_float32(X.iloc[:, self.num_idx_])
+        self.imputer_ = FastMedianImputer().fit(num)
+        self.medians_ = self.imputer_.medians_
+
+        if self.scale_numeric:
+            num = self.imputer_.transform(num)
+            self.mean_ = num.mean(axis=0, dtype=np.float64).astype(np.float32)
+            std = num.std(axis=0, dtype=np.float64)
+            std[std == 0.0] = 1.0
+            self.scale_ = std.astype(np.float32)
+
+        self.categories_ = []
+        self.mode_codes_ = []
+        for pos in self.cat_idx_:
+            col = X.iloc[:, pos]
+            cats = np.sort(np.asarray(col.dropna().unique()))
+            # mesmo critério do SimpleImputer(most_frequent): menor valor em empate
+            mode = col.mode(dropna=True)
+            self.categories_.append(cats)
+            self.mode_codes_.append(
+                int(np.searchsorted(cats, mode.iloc[0])) if len(mode) else -1
+            )
+
+        self.n_ohe_ = int(sum(len(c) for c in self.categories_))
+        return self
+
+    def transform(self, X) -> np.ndarray:
+        if not hasattr(self, "medians_"):
+            raise AttributeError("FastPreprocessor precisa ser ajustado (fit) antes.")
+        # posições do fit; recalculadas localmente se a ordem das colunas mudou,
+        # sem alterar o estado ajustado
+        if tuple(X.columns) == self.columns_:
+            num_idx, cat_idx = self.num_idx_, self.cat_idx_
+        else:
+            num_idx, cat_idx = self._positions(X)
+
+        n = len(X)
+        n_num = len(num_idx)
+        out = np.zeros((n, n_num + self.n_ohe_), dtype=np.float32)
+
+        num = out[:, :n_num]
+        num[...] = _as_float32(X.iloc[:, num_idx])
+        nan_mask = np.isnan(num)
+        if nan_mask.any():
+            np.copyto(num, np.broadcast_to(self.medians_, num.shape), where=nan_mask)
+        if self.scale_numeric:
+            num -= self.mean_
+            num /= self.scale_
+
+        rows = np.arange(n)
+        offset = n_num
+        for pos, mode_code, cats in zip(cat_idx, self.mode_codes_, self.categories_):
+            col = X.iloc[:, pos]
+            if isinstance(col.dtype, pd.CategoricalDtype) and col.cat.categories.equals(
+                pd.Index(cats)
+            ):
+                # colunas preparadas com prepare_categorical: usa os códigos diretamente
+                codes = col.cat.codes.to_numpy(dtype=np.int64, copy=True)
+            else:
+                codes = np.array(pd.Categorical(col, categories=cats).codes, dtype=np.int64)
+            codes[col.isna().to_numpy()] = mode_code
+            # códigos -1 (categoria desconhecida) ficam zerados, como handle_unknown="ignore"
+            known = codes >= 0
+            out[rows[known], offset + codes[known]] = 1.0
+            offset += len(cats)
+
+        return out
+
+    def get_feature_names_out(self, input_features=None) -> np.ndarray:
+        names = list(self.numeric_features_)
+        for col, cats in zip(self.categorical_features_, self.categories_):
+            names.extend(f"{col}_{c}" for c in cats)
+        return np.asarray(names, dtype=object)
+
+
+def prepare_categorical(
+    X: pd.DataFrame,
+    categorical_features: List[str] | None = None,
+) -> pd.DataFrame:
+    """
+    Converte as features categóricas para o dtype category do pandas.
+
+    Recomendado antes do fit/transform do FastPreprocessor: quando as
+    categorias da coluna coincidem com as vistas no fit, o one-hot é montado
+    diretamente a partir de .cat.codes, sem lookup por valor. Retorna uma
+    cópia; o DataFrame original não é alterado.
+    """
+    categorical_features = categorical_features or FEATURES_CATEGORICAS
+
+    X = X.copy()
+    for c in categorical_features:
+        X[c] = X[c].astype("category")
+    return X
+
+
 # =========================
 # Utilitários de interpretabilidade
 # =========================
@@ -150,8 +380,6 @@ def check_missing_ratio(
 
     Útil para diagnósticos rápidos antes da modelagem.
     """
-    import pandas as pd
-
     if not hasattr(X, "isna"):
         raise TypeError("X precisa ser um pandas DataFrame para checagem de nulos.")
 